@@ -1,15 +1,197 @@
-from sqlalchemy import create_engine
+import os
+import threading
+from time import perf_counter
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+load_dotenv()
+
+
+def to_async_url(url: str) -> str:
+    """Swap a sync database URL's driver for its asyncio counterpart."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+def env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Render hands out postgres:// URLs, which SQLAlchemy no longer accepts
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./system.db").replace(
+    "postgres://", "postgresql://", 1
+)
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL)
+)
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", -1))
+POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", False)
+
+# Applied to every new SQLite connection. WAL lets readers carry on while a review
+# or apprentice is being written instead of queueing behind the rollback journal.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    # Negative values are in KiB, so this is a 64MB page cache per connection
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024)),
+}
+
+
+class PoolStats:
+    """Checkout counters and wait times for one engine's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def attach(self, engine):
+        def count(attribute):
+            def listener(*args):
+                with self._lock:
+                    setattr(self, attribute, getattr(self, attribute) + 1)
+
+            return listener
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./system.db"
+        event.listen(engine, "connect", count("connects"))
+        event.listen(engine, "checkout", count("checkouts"))
+        event.listen(engine, "checkin", count("checkins"))
+        event.listen(engine, "invalidate", count("invalidations"))
 
+    def snapshot(self, pool) -> dict:
+        sizes = {}
+        if isinstance(pool, QueuePool):
+            sizes = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        with self._lock:
+            checkouts = self.checkouts
+            return {
+                **sizes,
+                "connects": self.connects,
+                "checkouts": checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / checkouts if checkouts else 0.0
+                ),
+            }
+
+
+def timed_pool(pool_class, stats: PoolStats):
+    """Subclass a queue pool so the time spent waiting for a connection is recorded."""
+
+    class TimedPool(pool_class):
+        def _do_get(self):
+            started = perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                with stats._lock:
+                    stats.timeouts += 1
+                raise
+            finally:
+                stats.record_wait(perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def engine_options(pool_class, stats: PoolStats) -> dict:
+    options = {"pool_pre_ping": POOL_PRE_PING, "pool_recycle": POOL_RECYCLE}
+    # In-memory SQLite has to stay on its single shared connection
+    if ":memory:" not in SQLALCHEMY_DATABASE_URL:
+        options.update(
+            poolclass=timed_pool(pool_class, stats),
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+        )
+    return options
+
+
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+# The sync engine is kept for schema setup, tests and scripts; request handlers
+# use the async engine so queries don't block the event loop
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **engine_options(QueuePool, sync_pool_stats),
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(AsyncAdaptedQueuePool, async_pool_stats)
+)
+# expire_on_commit=False so committed objects can still be read without an
+# implicit (and, under asyncio, illegal) lazy refresh
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+sync_pool_stats.attach(engine)
+async_pool_stats.attach(async_engine.sync_engine)
+if IS_SQLITE:
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
 Base = declarative_base()
 
 
+def pool_stats() -> dict:
+    return {
+        "sync": sync_pool_stats.snapshot(engine.pool),
+        "async": async_pool_stats.snapshot(async_engine.sync_engine.pool),
+    }
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes on tables that already exist, so add new ones here
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -7,7 +7,6 @@ from typing import Annotated, List, Optional
 
 
 import uvicorn
-from dotenv import load_dotenv
 from fastapi import (
     Cookie,
     Depends,
@@ -15,21 +14,24 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
     Request,
     Response,
     UploadFile,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from jinja2 import Environment, select_autoescape, FileSystemLoader
-from passlib.context import CryptContext
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, load_only
 
-from database import SessionLocal, init_db
+from database import AsyncSessionLocal, SessionLocal, init_db, pool_stats
 from models import Apprentice, Review, User
+from passwords import PasswordHasher, PasswordPoolSaturated
 
 app = FastAPI()
 
@@ -44,12 +46,11 @@ templates.env = env
 
 app.mount("/static", StaticFiles(directory="./static"), name="static")
 
-load_dotenv()
-
 init_db()
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt takes ~250ms per call, so it runs on a bounded pool instead of the event loop
+password_hasher = PasswordHasher.from_env()
 
 
 app.add_middleware(
@@ -62,6 +63,7 @@ app.add_middleware(
 
 
 def get_db():
+    # Blocking session for scripts and tests; endpoints use get_async_db
     db = SessionLocal()
     try:
         yield db
@@ -69,32 +71,50 @@ def get_db():
         db.close()
 
 
-def create_admin_user(db: Session):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def create_admin_user(db: AsyncSession):
     admin_username = os.getenv("ADMIN_USERNAME", "admin")
     admin_password = os.getenv("ADMIN_PASSWORD", "defaultpassword")
 
-    if not db.query(User).filter(User.username == admin_username).first():
-        hashed_password = pwd_context.hash(admin_password)
+    if not await db.scalar(select(User).where(User.username == admin_username)):
+        hashed_password = await password_hasher.hash(admin_password)
         admin_user = User(
             username=admin_username, hashed_password=hashed_password, is_admin=True
         )
         db.add(admin_user)
-        db.commit()
+        await db.commit()
 
 
 @app.on_event("startup")
 async def startup_event():
-    db = SessionLocal()
-    try:
-        create_admin_user(db)
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        await create_admin_user(db)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    password_hasher.shutdown()
 
 
-def get_current_user(username: str = Cookie(None), db: Session = Depends(get_db)):
+@app.exception_handler(PasswordPoolSaturated)
+async def password_pool_saturated_handler(request: Request, exc: PasswordPoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please try again shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def get_current_user(
+    username: str = Cookie(None), db: AsyncSession = Depends(get_async_db)
+):
     if not username:
         raise HTTPException(status_code=403, detail="User not authenticated")
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -162,6 +182,11 @@ class ApprenticeResponse(BaseModel):
         orm_mode = True
 
 
+class ApprenticePage(BaseModel):
+    items: List[ApprenticeResponse]
+    next_cursor: Optional[int] = None
+
+
 class ReviewCreate(BaseModel):
     content: str
     apprentice_id: int
@@ -200,7 +225,7 @@ LOCKOUT_TIME = 300  # 5 minutes in seconds
 
 
 @app.post("/login", response_class=HTMLResponse)
-async def login_post(request: Request, db: Session = Depends(get_db)):
+async def login_post(request: Request, db: AsyncSession = Depends(get_async_db)):
     form = await request.form()
     username = form.get("username")
     password = form.get("password")
@@ -225,8 +250,8 @@ async def login_post(request: Request, db: Session = Depends(get_db)):
             "index.html", {"request": request, "error": error_message}
         )
 
-    user = db.query(User).filter(User.username == username).first()
-    if user and pwd_context.verify(password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.username == username))
+    if user and await password_hasher.verify(password, user.hashed_password):
         # Successful login - clear attempts
         login_attempts[username] = []
         response = RedirectResponse(url="/dashboard", status_code=302)
@@ -241,16 +266,16 @@ async def login_post(request: Request, db: Session = Depends(get_db)):
 
 
 @app.post("/register")
-async def register_post(request: Request, db: Session = Depends(get_db)):
+async def register_post(request: Request, db: AsyncSession = Depends(get_async_db)):
     form = await request.form()
     username = form.get("username")
     password = form.get("password")
-    if db.query(User).filter(User.username == username).first():
+    if await db.scalar(select(User).where(User.username == username)):
         raise HTTPException(status_code=400, detail="Username already taken")
-    hashed_password = pwd_context.hash(password)
+    hashed_password = await password_hasher.hash(password)
     new_user = User(username=username, hashed_password=hashed_password)
     db.add(new_user)
-    db.commit()
+    await db.commit()
     return templates.TemplateResponse(
         "index.html",
         {"request": request, "message": "Registration successful! You can now log in."},
@@ -266,15 +291,24 @@ async def dashboard(request: Request, user: UserResponse = Depends(get_current_u
     )
 
 
+@app.get("/admin/stats")
+async def admin_stats(user: UserResponse = Depends(get_current_user)):
+    is_admin(user)
+    return {
+        "password_hashing": password_hasher.stats(),
+        "database_pool": pool_stats(),
+    }
+
+
 @app.get("/users", response_model=List[UserResponse])
 async def get_users(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
     # blocks all non-admin users
     is_admin(user)
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     return templates.TemplateResponse(
         "users.html", {"request": request, "users": users, "is_admin": user.is_admin}
     )
@@ -283,25 +317,25 @@ async def get_users(
 @app.post("/users", response_model=UserResponse)
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
     is_admin(current_user)
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         username=user_data.username,
         hashed_password=hashed_password,
         is_admin=user_data.is_admin,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
 @app.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
 
     if user:
         return user
@@ -313,59 +347,129 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
     is_admin(current_user)
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     db_user.username = user_data.username
     if user_data.password:
-        db_user.hashed_password = pwd_context.hash(user_data.password)
+        db_user.hashed_password = await password_hasher.hash(user_data.password)
     db_user.is_admin = user_data.is_admin
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
 @app.delete("/users/{user_id}", response_model=UserResponse)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
     is_admin(current_user)
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    db.delete(db_user)
-    db.commit()
+    await db.delete(db_user)
+    await db.commit()
     return db_user
 
 
+APPRENTICE_PAGE_SIZE = 50
+MAX_APPRENTICE_PAGE_SIZE = 200
+
+
+async def get_apprentice_page(
+    db: AsyncSession,
+    after: Optional[int] = None,
+    limit: int = APPRENTICE_PAGE_SIZE,
+    cohort_year: Optional[int] = None,
+    job_role: Optional[str] = None,
+    name: Optional[str] = None,
+) -> ApprenticePage:
+    # Keyset pagination: each page continues from the last id of the previous one,
+    # so deep pages cost the same as the first instead of growing with OFFSET
+    query = select(Apprentice, User.username).outerjoin(
+        User, Apprentice.creator_id == User.id
+    )
+    if after is not None:
+        query = query.where(Apprentice.id > after)
+    if cohort_year is not None:
+        query = query.where(Apprentice.cohort_year == cohort_year)
+    if job_role:
+        query = query.where(Apprentice.job_role == job_role)
+    if name:
+        # A range rather than LIKE so the prefix match can use ix_apprentices_name
+        query = query.where(Apprentice.name >= name, Apprentice.name < name + "\uffff")
+
+    # Fetch one extra row to find out whether there is a further page
+    rows = (await db.execute(query.order_by(Apprentice.id).limit(limit + 1))).all()
+    items = [
+        ApprenticeResponse(
+            id=apprentice.id,
+            name=apprentice.name,
+            email=apprentice.email,
+            age=apprentice.age,
+            cohort_year=apprentice.cohort_year,
+            job_role=apprentice.job_role,
+            skills=apprentice.skills,
+            creator_username=creator_username or "Deleted User",
+        )
+        for apprentice, creator_username in rows[:limit]
+    ]
+    next_cursor = items[-1].id if len(rows) > limit else None
+    return ApprenticePage(items=items, next_cursor=next_cursor)
+
+
 @app.get("/apprentices")
 async def apprentices(
     request: Request,
-    db: Session = Depends(get_db),
+    after: Optional[int] = None,
+    limit: int = Query(APPRENTICE_PAGE_SIZE, ge=1, le=MAX_APPRENTICE_PAGE_SIZE),
+    cohort_year: Optional[int] = None,
+    job_role: Optional[str] = None,
+    name: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
-    apprentices = db.query(Apprentice).all()
+    page = await get_apprentice_page(db, after, limit, cohort_year, job_role, name)
     return templates.TemplateResponse(
         "apprentice.html",
         {
             "request": request,
-            "apprentices": apprentices,
+            "apprentices": page.items,
+            "next_cursor": page.next_cursor,
+            "filters": {
+                "cohort_year": cohort_year,
+                "job_role": job_role or "",
+                "name": name or "",
+            },
             "is_admin": user.is_admin,
             "current_user": user,
         },
     )
 
 
+@app.get("/apprentices/page", response_model=ApprenticePage)
+async def apprentices_page(
+    after: Optional[int] = None,
+    limit: int = Query(APPRENTICE_PAGE_SIZE, ge=1, le=MAX_APPRENTICE_PAGE_SIZE),
+    cohort_year: Optional[int] = None,
+    job_role: Optional[str] = None,
+    name: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: UserResponse = Depends(get_current_user),
+):
+    return await get_apprentice_page(db, after, limit, cohort_year, job_role, name)
+
+
 @app.post("/apprentices", response_model=ApprenticeResponse)
 async def create_apprentice(
     apprentice_data: ApprenticeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
     new_apprentice = Apprentice(
@@ -378,11 +482,11 @@ async def create_apprentice(
         creator_id=current_user.id,
     )
     db.add(new_apprentice)
-    db.commit()
-    db.refresh(new_apprentice)
+    await db.commit()
+    await db.refresh(new_apprentice)
 
-    creator_username = (
-        db.query(User.username).filter(User.id == current_user.id).scalar()
+    creator_username = await db.scalar(
+        select(User.username).where(User.id == current_user.id)
     )
 
     return ApprenticeResponse(
@@ -400,15 +504,15 @@ async def create_apprentice(
 @app.get("/apprentices/{apprentice_id}", response_model=ApprenticeResponse)
 async def get_apprentice(
     apprentice_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
-    apprentice = db.query(Apprentice).filter(Apprentice.id == apprentice_id).first()
+    apprentice = await db.get(Apprentice, apprentice_id)
     if not apprentice:
         raise HTTPException(status_code=404, detail="Apprentice not found")
 
     creator_username = (
-        db.query(User.username).filter(User.id == apprentice.creator_id).scalar()
+        await db.scalar(select(User.username).where(User.id == apprentice.creator_id))
         or "Deleted User"
     )
 
@@ -428,11 +532,11 @@ async def get_apprentice(
 async def update_apprentice(
     apprentice_id: int,
     apprentice_data: ApprenticeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
 
-    db_apprentice = db.query(Apprentice).filter(Apprentice.id == apprentice_id).first()
+    db_apprentice = await db.get(Apprentice, apprentice_id)
 
     if not db_apprentice:
         raise HTTPException(status_code=404, detail="Apprentice not found")
@@ -453,10 +557,10 @@ async def update_apprentice(
     db_apprentice.job_role = apprentice_data.job_role
     db_apprentice.skills = apprentice_data.skills
 
-    db.commit()
-    db.refresh(db_apprentice)
+    await db.commit()
+    await db.refresh(db_apprentice)
 
-    creator = db.query(User).filter(User.id == db_apprentice.creator_id).first()
+    creator = await db.get(User, db_apprentice.creator_id)
     creator_username = creator.username if creator else "Deleted User"
 
     return ApprenticeResponse(
@@ -474,16 +578,16 @@ async def update_apprentice(
 @app.delete("/apprentices/{apprentice_id}", response_model=ApprenticeResponse)
 async def delete_apprentice(
     apprentice_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
     is_admin(user)
 
-    db_apprentice = db.query(Apprentice).filter(Apprentice.id == apprentice_id).first()
+    db_apprentice = await db.get(Apprentice, apprentice_id)
     if not db_apprentice:
         raise HTTPException(status_code=404, detail="Apprentice not found")
 
-    creator = db.query(User).filter(User.id == db_apprentice.creator_id).first()
+    creator = await db.get(User, db_apprentice.creator_id)
 
     creator_username = creator.username if creator else "Deleted User"
 
@@ -498,26 +602,67 @@ async def delete_apprentice(
         creator_username=creator_username,
     )
 
-    db.delete(db_apprentice)
-    db.commit()
+    await db.delete(db_apprentice)
+    await db.commit()
 
     return response
 
 
+REVIEW_PAGE_SIZE = 50
+MAX_REVIEW_PAGE_SIZE = 200
+
+
+async def get_review_page(
+    db: AsyncSession, after: Optional[int] = None, limit: int = REVIEW_PAGE_SIZE
+):
+    # The apprentice and author are filled from the same joined SELECT, so the
+    # template never triggers a lazy load per review card
+    query = (
+        select(Review)
+        .join(Review.apprentice)
+        .join(Review.user)
+        .options(
+            load_only(
+                Review.id,
+                Review.content,
+                Review.user_id,
+                Review.date_of_review,
+                Review.progress_review_form,
+                Review.completed,
+            ),
+            contains_eager(Review.apprentice).load_only(Apprentice.id, Apprentice.name),
+            contains_eager(Review.user).load_only(User.id, User.username),
+        )
+    )
+    if after is not None:
+        query = query.where(Review.id > after)
+
+    rows = (await db.scalars(query.order_by(Review.id).limit(limit + 1))).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
 @app.get("/reviews")
 async def reviews(
     request: Request,
-    db: Session = Depends(get_db),
+    after: Optional[int] = None,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=MAX_REVIEW_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
-    reviews = db.query(Review).join(Review.apprentice).join(Review.user).all()
-    apprentices = db.query(Apprentice).all()
+    reviews, next_cursor = await get_review_page(db, after, limit)
+    # Only the id and name are needed for the apprentice dropdown
+    apprentices = await db.execute(
+        select(Apprentice.id, Apprentice.name).order_by(Apprentice.name)
+    )
     return templates.TemplateResponse(
         "reviews.html",
         {
             "request": request,
             "reviews": reviews,
-            "apprentices": apprentices,
+            "next_cursor": next_cursor,
+            "is_first_page": after is None,
+            "apprentices": apprentices.all(),
             "is_admin": user.is_admin,
             "current_user": user,
         },
@@ -531,7 +676,7 @@ async def create_review(
     date_of_review: str = Form(...),
     completed: bool = Form(False),
     review_document: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
     try:
@@ -555,25 +700,25 @@ async def create_review(
         )
 
         db.add(new_review)
-        db.commit()
-        db.refresh(new_review)
+        await db.commit()
+        await db.refresh(new_review)
 
         return new_review
 
     except Exception as e:
         if document_path and os.path.exists(document_path):
             os.remove(document_path)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/reviews/{review_id}", response_model=ReviewResponse)
 async def get_review(
     review_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     return review
@@ -587,11 +732,11 @@ async def update_review(
     date_of_review: str = Form(...),
     completed: bool = Form(False),
     review_document: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserResponse = Depends(get_current_user),
 ):
     # Get existing review
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
 
@@ -628,19 +773,19 @@ async def update_review(
         review.date_of_review = datetime.strptime(date_of_review, "%Y-%m-%d").date()
         review.completed = completed
 
-        db.commit()
-        db.refresh(review)
+        await db.commit()
+        await db.refresh(review)
         return review
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.delete("/reviews/{review_id}")
 async def delete_review(
     review_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: UserResponse = Depends(get_current_user),
 ):
     if not user.is_admin:
@@ -648,12 +793,12 @@ async def delete_review(
             status_code=403, detail="Only administrators can delete reviews"
         )
 
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
 
-    db.delete(review)
-    db.commit()
+    await db.delete(review)
+    await db.commit()
     return {"message": "Review deleted successfully"}
 
 
@@ -1,6 +1,6 @@
 from datetime import timedelta
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, Date, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -18,6 +18,13 @@ class User(Base):
 
 class Apprentice(Base):
     __tablename__ = "apprentices"
+    # Listing filters narrow on cohort/job role and page through ids in order
+    __table_args__ = (
+        Index(
+            "ix_apprentices_cohort_year_job_role_id", "cohort_year", "job_role", "id"
+        ),
+        Index("ix_apprentices_job_role_id", "job_role", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the password pool already has as much work as it will queue."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+# Module-level so they can be pickled into a process pool. Each returns the time
+# spent inside bcrypt, which lets the caller split queue wait from hashing time.
+def _timed_hash(password):
+    started = perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, perf_counter() - started
+
+
+def _timed_verify(password, hashed_password):
+    started = perf_counter()
+    matches = pwd_context.verify(password, hashed_password)
+    return matches, perf_counter() - started
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded thread or process pool.
+
+    At most ``workers + max_queue`` operations are accepted at once; anything
+    beyond that raises PasswordPoolSaturated instead of queueing without limit.
+    """
+
+    def __init__(self, workers=4, max_queue=32, kind="thread", retry_after=1):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password pool kind: {kind}")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self.retry_after = retry_after
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._hash_seconds = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            workers=int(
+                os.getenv("PASSWORD_POOL_WORKERS", min(4, os.cpu_count() or 1))
+            ),
+            max_queue=int(os.getenv("PASSWORD_POOL_MAX_QUEUE", 32)),
+            kind=os.getenv("PASSWORD_POOL_KIND", "thread"),
+            retry_after=int(os.getenv("PASSWORD_POOL_RETRY_AFTER", 1)),
+        )
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_timed_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(_timed_verify, password, hashed_password)
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise PasswordPoolSaturated(self.retry_after)
+            self._pending += 1
+
+        submitted = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, hash_seconds = await loop.run_in_executor(
+                self._get_executor(), func, *args
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        wait_seconds = max(perf_counter() - submitted - hash_seconds, 0.0)
+        with self._lock:
+            self._completed += 1
+            self._hash_seconds += hash_seconds
+            self._wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+        return result
+
+    def _get_executor(self):
+        # Created on first use so importing the app never forks worker processes
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    executor_class = (
+                        ProcessPoolExecutor
+                        if self.kind == "process"
+                        else ThreadPoolExecutor
+                    )
+                    self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "completed": completed,
+                "rejected": self._rejected,
+                "wait_seconds_total": self._wait_seconds,
+                "wait_seconds_max": self._max_wait_seconds,
+                "wait_seconds_avg": (
+                    self._wait_seconds / completed if completed else 0.0
+                ),
+                "hash_seconds_total": self._hash_seconds,
+                "hash_seconds_avg": (
+                    self._hash_seconds / completed if completed else 0.0
+                ),
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,90 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ..main import app
+
+client = TestClient(app)
+
+valid_password = "Test@1234"
+
+
+@pytest.fixture(autouse=True)
+def mock_static_files():
+    # Mock StaticFiles to avoid the error during tests
+    app = FastAPI()
+    app.mount = MagicMock()
+    app.mount("/static", MagicMock(), name="static")
+    return app
+
+
+@pytest.fixture
+def user_login():
+    username = f"user_{uuid.uuid4().hex[:8]}"
+    client.post("/register", data={"username": username, "password": valid_password})
+    response = client.post(
+        "/login", data={"username": username, "password": valid_password}
+    )
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    return username
+
+
+def create_apprentices(job_role, count):
+    ids = []
+    for i in range(count):
+        response = client.post(
+            "/apprentices",
+            json={
+                "name": f"Apprentice {i}",
+                "email": f"apprentice{i}@example.com",
+                "age": 20,
+                "cohort_year": 2024,
+                "job_role": job_role,
+                "skills": "Python",
+            },
+        )
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_apprentice_pages_follow_cursor(user_login):
+    job_role = f"Role {uuid.uuid4().hex[:8]}"
+    ids = create_apprentices(job_role, 3)
+
+    first = client.get("/apprentices/page", params={"job_role": job_role, "limit": 2})
+    assert first.status_code == 200
+    first_page = first.json()
+    assert [item["id"] for item in first_page["items"]] == ids[:2]
+    assert first_page["next_cursor"] == ids[1]
+    assert first_page["items"][0]["creator_username"] == user_login
+
+    second = client.get(
+        "/apprentices/page",
+        params={"job_role": job_role, "limit": 2, "after": first_page["next_cursor"]},
+    )
+    second_page = second.json()
+    assert [item["id"] for item in second_page["items"]] == ids[2:]
+    assert second_page["next_cursor"] is None
+
+
+def test_apprentice_page_filters_by_name_prefix(user_login):
+    job_role = f"Role {uuid.uuid4().hex[:8]}"
+    create_apprentices(job_role, 2)
+
+    response = client.get(
+        "/apprentices/page", params={"job_role": job_role, "name": "Apprentice 1"}
+    )
+    assert [item["name"] for item in response.json()["items"]] == ["Apprentice 1"]
+
+
+def test_apprentices_listing_renders_first_page(user_login):
+    job_role = f"Role {uuid.uuid4().hex[:8]}"
+    create_apprentices(job_role, 1)
+
+    response = client.get("/apprentices", params={"job_role": job_role})
+    assert response.status_code == 200
+    assert job_role in response.text
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from passwords import PasswordHasher, PasswordPoolSaturated
+
+from ..main import app, password_hasher
+
+client = TestClient(app)
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+
+    async def round_trip():
+        hashed = await hasher.hash("Test@1234")
+        return await hasher.verify("Test@1234", hashed), await hasher.verify(
+            "wrong", hashed
+        )
+
+    assert asyncio.run(round_trip()) == (True, False)
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["hash_seconds_total"] > 0
+    hasher.shutdown()
+
+
+def test_saturated_pool_rejects_new_work():
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    release = threading.Event()
+
+    def blocking(*args):
+        release.wait()
+        return None, 0.0
+
+    async def overload():
+        blocked = asyncio.ensure_future(hasher._submit(blocking))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(PasswordPoolSaturated):
+                await hasher.hash("Test@1234")
+        finally:
+            release.set()
+            await blocked
+
+    asyncio.run(overload())
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+
+def test_saturated_pool_returns_503(monkeypatch):
+    monkeypatch.setattr(password_hasher, "_pending", password_hasher.capacity)
+
+    response = client.post(
+        "/register", data={"username": "busy_user", "password": "Test@1234"}
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(password_hasher.retry_after)
@@ -0,0 +1,112 @@
+import uuid
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import async_engine
+
+from ..main import app
+
+client = TestClient(app)
+
+valid_password = "Test@1234"
+
+
+@pytest.fixture(autouse=True)
+def mock_static_files():
+    # Mock StaticFiles to avoid the error during tests
+    app = FastAPI()
+    app.mount = MagicMock()
+    app.mount("/static", MagicMock(), name="static")
+    return app
+
+
+@pytest.fixture
+def user_login():
+    username = f"user_{uuid.uuid4().hex[:8]}"
+    client.post("/register", data={"username": username, "password": valid_password})
+    response = client.post(
+        "/login", data={"username": username, "password": valid_password}
+    )
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    return username
+
+
+def create_apprentice():
+    response = client.post(
+        "/apprentices",
+        json={
+            "name": "Review Subject",
+            "email": "subject@example.com",
+            "age": 22,
+            "cohort_year": 2024,
+            "job_role": "Engineer",
+            "skills": "Python",
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def create_reviews(count):
+    # A separate apprentice per review, so a lazy load per card would show up
+    ids = []
+    for i in range(count):
+        response = client.post(
+            "/reviews",
+            data={
+                "apprentice_id": create_apprentice(),
+                "content": f"Review {i}",
+                "date_of_review": "2024-05-01",
+            },
+        )
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    # Async engines emit their events through the underlying sync engine
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_reviews_page_statement_count_is_constant(user_login):
+    # Start the page just before this test's reviews so it only shows them
+    after = create_reviews(1)[0] - 1
+
+    with count_statements() as few:
+        response = client.get("/reviews", params={"after": after})
+    assert response.status_code == 200
+    assert "Review 0" in response.text
+
+    create_reviews(5)
+
+    with count_statements() as many:
+        response = client.get("/reviews", params={"after": after})
+    assert response.status_code == 200
+    assert "Review 4" in response.text
+
+    assert len(many) == len(few)
+
+
+def test_reviews_page_links_to_next_page(user_login):
+    ids = create_reviews(3)
+
+    response = client.get("/reviews", params={"after": ids[0] - 1, "limit": 2})
+    assert response.status_code == 200
+    assert f"/reviews?after={ids[1]}" in response.text